@@ -11,6 +11,7 @@ import json
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
+import threading
 
 
 class A2AEventType(Enum):
@@ -43,6 +44,8 @@ class A2AEventBus:
             "events_by_type": {},
             "last_event_time": None
         }
+        # Events are published from agent callbacks and the classification notifier thread
+        self._lock = threading.Lock()
     
     def subscribe(self, event_type: A2AEventType, callback: Callable[[A2AEvent], None]) -> None:
         """Subscribe to a specific event type."""
@@ -52,25 +55,27 @@ class A2AEventBus:
     
     def publish(self, event: A2AEvent) -> None:
         """Publish an event to all subscribers."""
-        # Store event in history
-        self.event_history.append(event)
-        
-        # Update metrics
-        self.metrics["total_events"] += 1
-        self.metrics["last_event_time"] = event.timestamp
-        
-        event_type_str = event.event_type.value
-        if event_type_str not in self.metrics["events_by_type"]:
-            self.metrics["events_by_type"][event_type_str] = 0
-        self.metrics["events_by_type"][event_type_str] += 1
+        with self._lock:
+            # Store event in history
+            self.event_history.append(event)
+            
+            # Update metrics
+            self.metrics["total_events"] += 1
+            self.metrics["last_event_time"] = event.timestamp
+            
+            event_type_str = event.event_type.value
+            if event_type_str not in self.metrics["events_by_type"]:
+                self.metrics["events_by_type"][event_type_str] = 0
+            self.metrics["events_by_type"][event_type_str] += 1
+            
+            callbacks = list(self.subscribers.get(event.event_type, ()))
         
-        # Notify subscribers
-        if event.event_type in self.subscribers:
-            for callback in self.subscribers[event.event_type]:
-                try:
-                    callback(event)
-                except Exception as e:
-                    print(f"[A2A] Error in callback for {event.event_type}: {e}")
+        # Notify subscribers outside the lock; a callback may publish further events
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"[A2A] Error in callback for {event.event_type}: {e}")
     
     def get_events(self, event_type: Optional[A2AEventType] = None, 
                    limit: Optional[int] = None) -> List[A2AEvent]:
@@ -87,7 +92,10 @@ class A2AEventBus:
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get event bus metrics."""
-        return self.metrics.copy()
+        with self._lock:
+            metrics = self.metrics.copy()
+            metrics["events_by_type"] = dict(metrics["events_by_type"])
+        return metrics
 
 
 class A2AProtocolHandler:
@@ -11,7 +11,7 @@ from typing import Dict, Any, Optional, List
 
 # Add the parent directory to the path to import database module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import IncidentDatabase
+from database import IncidentDatabase, INCIDENT_COLUMNS
 from utils import format_bug_reports_table
 from config import (
     get_bug_categories, get_bug_statuses, get_default_user_id,
@@ -713,8 +713,8 @@ To avoid duplicate reports, please check your existing incident first.""",
             
             with sqlite3.connect(db.db_path) as conn:
                 conn.row_factory = sqlite3.Row
-                cursor = conn.execute("""
-                    SELECT * FROM incidents 
+                cursor = conn.execute(f"""
+                    SELECT {INCIDENT_COLUMNS} FROM incidents 
                     WHERE user_id = ? AND status IN ('Resolved', 'Closed') AND id != ?
                     ORDER BY date_created DESC
                 """, (user_id, exclude_incident_id))
@@ -754,8 +754,8 @@ To avoid duplicate reports, please check your existing incident first.""",
             
             with sqlite3.connect(db.db_path) as conn:
                 conn.row_factory = sqlite3.Row
-                cursor = conn.execute("""
-                    SELECT * FROM incidents 
+                cursor = conn.execute(f"""
+                    SELECT {INCIDENT_COLUMNS} FROM incidents 
                     WHERE user_id = ? AND status IN ('Open', 'In Progress')
                     ORDER BY date_created DESC
                 """, (user_id,))
@@ -1,8 +1,30 @@
 import sqlite3
 import os
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 from config import get_database_name, BUG_REPORT_CONFIG
+from issue_features import FEATURES_VERSION, create_issue_hash, create_issue_masks
+
+
+# Database files whose schema has already been set up by this process
+_initialized_paths: Set[str] = set()
+_init_lock = threading.Lock()
+
+# Columns returned to callers; the precomputed duplicate-detection columns stay internal
+INCIDENT_COLUMNS = ("id, user_id, user_name, user_email, category, description, "
+                    "date_observed, date_created, status, level, last_updated")
+
+
+def open_shared_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Open a long-lived autocommit connection in WAL mode that may be used from any thread.
+    Callers keep it for the life of the process and serialize access to it.
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
 
 
 class IncidentDatabase:
@@ -11,7 +33,18 @@ class IncidentDatabase:
     def __init__(self, db_path: str | None = None):
         """Initialize the database connection and create tables if needed."""
         self.db_path = db_path or get_database_name()
-        self.init_database()
+        if self.db_path == ":memory:":
+            self.init_database()
+            return
+        
+        # Schema setup only needs to run once per database file; a relative path
+        # names a different file once the working directory changes
+        path_key = os.path.abspath(self.db_path)
+        if path_key not in _initialized_paths:
+            with _init_lock:
+                if path_key not in _initialized_paths:
+                    self.init_database()
+                    _initialized_paths.add(path_key)
     
     def init_database(self):
         """Create the incidents table if it doesn't exist."""
@@ -41,6 +74,45 @@ class IncidentDatabase:
                 # Column already exists
                 pass
             
+            # Precomputed description features used by duplicate detection
+            for column, column_type in (("description_lower", "TEXT"), ("description_hash", "TEXT"),
+                                        ("description_sem_mask", "INTEGER"), ("description_phrase_mask", "INTEGER"),
+                                        ("description_features_version", "INTEGER")):
+                try:
+                    conn.execute(f"ALTER TABLE incidents ADD COLUMN {column} {column_type}")
+                except sqlite3.OperationalError:
+                    # Column already exists
+                    pass
+            
+            # Backfill rows created before the columns existed, and recompute masks
+            # built from older semantic group / phrase pattern definitions
+            rows = conn.execute("""
+                SELECT id, description FROM incidents
+                WHERE description_features_version IS NOT ?
+            """, (FEATURES_VERSION,)).fetchall()
+            if rows:
+                conn.executemany("""
+                    UPDATE incidents 
+                    SET description_lower = ?, description_hash = ?,
+                        description_sem_mask = ?, description_phrase_mask = ?,
+                        description_features_version = ?
+                    WHERE id = ?
+                """, [(description.lower(), create_issue_hash(description),
+                       *create_issue_masks(description.lower()), FEATURES_VERSION, incident_id)
+                      for incident_id, description in rows])
+            
+            # Duplicate detection looks up a user's open incidents
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_incidents_user_status
+                ON incidents (user_id, status)
+            """)
+            
+            # Exact-resubmission lookup by description fingerprint
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_incidents_user_hash
+                ON incidents (user_id, description_hash)
+            """)
+            
             conn.commit()
     
     def create_incident(self, user_id: str, user_name: str, user_email: str,
@@ -54,15 +126,19 @@ class IncidentDatabase:
         )
         
         date_created = datetime.now().isoformat()
+        description_lower = description.lower()
         
         with sqlite3.connect(self.db_path) as conn:
             conn.execute("""
                 INSERT INTO incidents 
                 (id, user_id, user_name, user_email, category, description, 
-                 date_observed, date_created, status, level)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 date_observed, date_created, status, level, description_lower, description_hash,
+                 description_sem_mask, description_phrase_mask, description_features_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (incident_id, user_id, user_name, user_email, category, 
-                  description, date_observed, date_created, BUG_REPORT_CONFIG["default_status"], level))
+                  description, date_observed, date_created, BUG_REPORT_CONFIG["default_status"], level,
+                  description_lower, create_issue_hash(description), *create_issue_masks(description_lower),
+                  FEATURES_VERSION))
             conn.commit()
         
         return {
@@ -82,8 +158,8 @@ class IncidentDatabase:
         """Get all incidents for a specific user."""
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM incidents 
+            cursor = conn.execute(f"""
+                SELECT {INCIDENT_COLUMNS} FROM incidents 
                 WHERE user_id = ? 
                 ORDER BY date_created DESC
             """, (user_id,))
@@ -109,8 +185,8 @@ class IncidentDatabase:
         with sqlite3.connect(self.db_path) as conn:
             # First, get the current incident
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM incidents 
+            cursor = conn.execute(f"""
+                SELECT {INCIDENT_COLUMNS} FROM incidents 
                 WHERE id = ? AND user_id = ?
             """, (incident_id, user_id))
             
@@ -140,8 +216,8 @@ class IncidentDatabase:
         """Get a specific incident by ID for a user."""
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM incidents 
+            cursor = conn.execute(f"""
+                SELECT {INCIDENT_COLUMNS} FROM incidents 
                 WHERE id = ? AND user_id = ?
             """, (incident_id, user_id))
             
@@ -152,8 +228,8 @@ class IncidentDatabase:
         """Get all incidents (admin function)."""
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM incidents 
+            cursor = conn.execute(f"""
+                SELECT {INCIDENT_COLUMNS} FROM incidents 
                 ORDER BY date_created DESC
             """)
             
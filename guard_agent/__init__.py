@@ -4,6 +4,15 @@ Guard Agent Module
 This module contains the Guard Agent that classifies user inputs into bug severity levels.
 """
 
+import os
+import sys
+
+# The tools import the top-level config, database and a2a_integration modules;
+# make the project root importable once for the whole package
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+
 from .agent import GuardAgent
 
 __all__ = ['GuardAgent'] 
\ No newline at end of file
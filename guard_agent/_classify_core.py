@@ -0,0 +1,187 @@
+"""
+Level Classification Core for Guard Agent
+
+Keyword and pattern scoring used by the level assignment tool. The module is
+self-contained and fully typed so it can be compiled with mypyc
+(`mypyc guard_agent/_classify_core.py`); the pure-Python version is used
+when no compiled build is present.
+"""
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import ahocorasick  # type: ignore[import-not-found]
+except ImportError:
+    # pyahocorasick not installed - keywords are matched with a substring scan
+    ahocorasick = None  # type: ignore[assignment]
+
+
+# Level 5: Critical emergencies (doxxing, legal issues, server outages)
+_LEVEL_5_KEYWORDS = [
+    "doxx", "dox", "personal info", "address leak", "phone number leak",
+    "legal", "lawsuit", "court", "police", "attorney", "lawyer",
+    "server down", "complete outage", "total failure", "system crash",
+    "data breach", "hack", "hacked", "stolen data", "privacy violation",
+    "emergency", "urgent", "critical", "immediate help"
+]
+
+_LEVEL_5_PATTERNS = [
+    r"server.*down", r"complete.*outage", r"total.*failure",
+    r"data.*breach", r"personal.*information.*leaked",
+    r"legal.*action", r"court.*case", r"emergency.*situation"
+]
+
+# Level 4: Security/fraud issues (hacking, stolen items)  
+_LEVEL_4_KEYWORDS = [
+    "hack", "hacker", "compromised", "stolen", "fraud", "scam",
+    "unauthorized", "suspicious activity", "account taken",
+    "password changed", "logged out", "can't login", "security",
+    "malware", "virus", "phishing", "suspicious email"
+]
+
+_LEVEL_4_PATTERNS = [
+    r"account.*compromised", r"password.*changed.*me",
+    r"suspicious.*activity", r"unauthorized.*access",
+    r"can't.*log.*in", r"logged.*out.*automatically"
+]
+
+# Level 3: Unstructured but solvable problems (save corruption, gameplay issues)
+_LEVEL_3_KEYWORDS = [
+    "save", "corrupt", "progress lost", "game crash", "freeze", "lag",
+    "performance", "slow", "bug", "glitch", "error", "broken",
+    "not working", "weird", "strange behavior", "unexpected"
+]
+
+_LEVEL_3_PATTERNS = [
+    r"save.*corrupt", r"progress.*lost", r"game.*crash",
+    r"not.*working.*properly", r"weird.*behavior", r"strange.*issue"
+]
+
+# Level 2: Common technical/account issues (crashes, login problems)
+_LEVEL_2_KEYWORDS = [
+    "crash", "login", "sign in", "password", "reset", "forgot",
+    "technical", "support", "help", "issue", "problem",
+    "won't start", "loading", "connection", "sync"
+]
+
+_LEVEL_2_PATTERNS = [
+    r"can't.*login", r"forgot.*password", r"won't.*start",
+    r"loading.*problem", r"connection.*issue", r"sync.*problem"
+]
+
+# Level 1: Simple FAQ questions (how-to, information requests)
+_LEVEL_1_KEYWORDS = [
+    "explain", "tell me",
+    "information", "guide", "tutorial", "help", "learn",
+    "feature", "function"
+]
+
+# Short, common Level 1 words are matched as whole words only, so they no
+# longer score inside "somehow", "whatever", "user", "network" and the like
+_L1_WORDS = re.compile(r"\b(?:how|what|when|where|why|use|work|setup)\b")
+
+_LEVEL_1_PATTERNS = [
+    r"how.*do.*i", r"how.*to", r"what.*is", r"how.*does.*work",
+    r"can.*you.*explain", r"tell.*me.*about", r"information.*about"
+]
+
+# Compiled once at import rather than looked up in the re cache on every call
+_L5_PATTERNS = tuple(re.compile(p) for p in _LEVEL_5_PATTERNS)
+_L4_PATTERNS = tuple(re.compile(p) for p in _LEVEL_4_PATTERNS)
+_L3_PATTERNS = tuple(re.compile(p) for p in _LEVEL_3_PATTERNS)
+_L2_PATTERNS = tuple(re.compile(p) for p in _LEVEL_2_PATTERNS)
+_L1_PATTERNS = tuple(re.compile(p) for p in _LEVEL_1_PATTERNS)
+
+# Score added per matched keyword, by level
+_KEYWORD_WEIGHTS = {5: 3.0, 4: 2.5, 3: 2.0, 2: 1.5, 1: 1.0}
+
+# Patterns and the score each match adds, highest priority level first
+_PATTERN_LEVELS = (
+    (5, _L5_PATTERNS, 4.0),
+    (4, _L4_PATTERNS, 3.0),
+    (3, _L3_PATTERNS, 2.5),
+    (2, _L2_PATTERNS, 2.0),
+    (1, _L1_PATTERNS, 1.5),
+)
+
+# Most a level can still gain from its patterns, indexed by level; index 0 unused
+_MAX_PATTERN_SCORE = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+for _level, _patterns, _weight in _PATTERN_LEVELS:
+    _MAX_PATTERN_SCORE[_level] = len(_patterns) * _weight
+
+
+def _build_keyword_hits() -> Dict[str, Tuple[Tuple[int, float], ...]]:
+    """Map each keyword to the (level, weight) pairs of every level that lists it."""
+    keyword_hits: Dict[str, List[Tuple[int, float]]] = {}
+    for level, keywords in ((5, _LEVEL_5_KEYWORDS), (4, _LEVEL_4_KEYWORDS), (3, _LEVEL_3_KEYWORDS),
+                            (2, _LEVEL_2_KEYWORDS), (1, _LEVEL_1_KEYWORDS)):
+        for keyword in keywords:
+            keyword_hits.setdefault(keyword, []).append((level, _KEYWORD_WEIGHTS[level]))
+    return {keyword: tuple(hits) for keyword, hits in keyword_hits.items()}
+
+
+def _build_keyword_automaton() -> "ahocorasick.Automaton":
+    """Build a single Aho-Corasick automaton over the keywords of every level."""
+    automaton = ahocorasick.Automaton()
+    for keyword, hits in _KEYWORD_HITS.items():
+        automaton.add_word(keyword, (keyword, hits))
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_HITS = _build_keyword_hits()
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if ahocorasick is not None else None
+
+
+def _match_keywords(input_lower: str) -> Iterable[Tuple[Tuple[int, float], ...]]:
+    """Return the (level, weight) pairs of each distinct keyword found in the input."""
+    if _KEYWORD_AUTOMATON is not None:
+        # Single pass over the input; a keyword counts once however often it occurs
+        return {keyword: hits for _, (keyword, hits) in _KEYWORD_AUTOMATON.iter(input_lower)}.values()
+    return [hits for keyword, hits in _KEYWORD_HITS.items() if keyword in input_lower]
+
+
+def _is_settled(level_scores: List[float], level: int, best: float) -> bool:
+    """
+    True when `best`, the top score among the levels above `level`, already beats
+    every level from `level` down even if all of their remaining patterns matched.
+    Ties go to the lower level, so the lead has to be strict.
+    """
+    for lower in range(1, level + 1):
+        if level_scores[lower] + _MAX_PATTERN_SCORE[lower] >= best:
+            return False
+    return True
+
+
+def classify_core(input_lower: str) -> Tuple[int, float]:
+    """
+    Score lowercased input against every level's keywords and patterns.
+    
+    Returns:
+        Tuple of (winning level, its score). The score is 0.0 when no
+        keyword or pattern matched; the lowest level wins a tie.
+    """
+    level_scores = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]  # Indexed by level; index 0 unused
+    
+    # Keywords of every level
+    for hits in _match_keywords(input_lower):
+        for level, weight in hits:
+            level_scores[level] += weight
+    
+    # Whole-word Level 1 keywords; each distinct word counts once
+    level_scores[1] += len(set(_L1_WORDS.findall(input_lower))) * _KEYWORD_WEIGHTS[1]
+    
+    # Patterns, highest level first; stop once no lower level can still catch up
+    best = 0.0  # Best final score among the levels already scored
+    for level, patterns, weight in _PATTERN_LEVELS:
+        if best > 0.0 and _is_settled(level_scores, level, best):
+            break
+        for pattern in patterns:
+            if pattern.search(input_lower):
+                level_scores[level] += weight
+        if level_scores[level] > best:
+            best = level_scores[level]
+    
+    max_score = max(level_scores)
+    return level_scores.index(max_score), max_score
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+Timestamp Helper for Guard Agent
+
+Shared by the agent callbacks and the level assignment tool, which stamp every
+classification and level update with the current local time.
+"""
+
+import time
+from datetime import datetime
+
+
+# (epoch_second, formatted date/time prefix), swapped in one assignment so a
+# concurrent caller never sees a second paired with another second's prefix
+_ts_cache = (0, "")
+
+
+def fast_iso_now() -> str:
+    """Return the current local time as ISO 8601 with microseconds, formatting the date part once per second."""
+    global _ts_cache
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_seconds, prefix = _ts_cache
+    if seconds != cached_seconds:
+        prefix = datetime.fromtimestamp(seconds).isoformat()
+        _ts_cache = (seconds, prefix)
+    return f"{prefix}.{nanos // 1000:06d}"
\ No newline at end of file
@@ -10,9 +10,14 @@ This agent provides comprehensive incident management with specialized tools for
 The agent follows best practices with modular tool organization.
 """
 
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
 from google.adk.agents import Agent
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, Optional, ClassVar, Callable, Tuple
+from dataclasses import dataclass, asdict
 
 # Import tools from the tools package
 from .tools import (
@@ -22,31 +27,11 @@ from .tools import (
     get_classification_history,
     analyze_escalation_pattern
 )
+from ._timestamps import fast_iso_now
 
 
-class GuardAgent(Agent):
-    """
-    Guard Agent with specialized tools for comprehensive incident management.
-    
-    This agent uses dedicated tools for:
-    1. Assigning incident levels (assign_incident_level)
-    2. Detecting duplicate issues (detect_duplicate_issues) 
-    3. Sending support email alerts (send_support_email)
-    4. Analyzing escalation patterns (analyze_escalation_pattern)
-    """
-    
-    def __init__(self):
-        # Define specialized tools
-        tools = [
-            assign_incident_level,
-            detect_duplicate_issues,
-            send_support_email,
-            get_classification_history,
-            analyze_escalation_pattern,
-        ]
-        
-        # Enhanced agent configuration
-        agent_config = """
+# Enhanced agent configuration
+_AGENT_CONFIG = """
         You are a Guard Agent with specialized tools for comprehensive incident management.
         
         Your primary functions:
@@ -84,20 +69,83 @@ class GuardAgent(Agent):
         Always provide clear, actionable recommendations and maintain detailed logs of all activities.
         Use the appropriate tool for each specific task rather than attempting to handle everything manually.
         """
-        
+
+
+class GuardAgent(Agent):
+    """
+    Guard Agent with specialized tools for comprehensive incident management.
+    
+    This agent uses dedicated tools for:
+    1. Assigning incident levels (assign_incident_level)
+    2. Detecting duplicate issues (detect_duplicate_issues) 
+    3. Sending support email alerts (send_support_email)
+    4. Analyzing escalation patterns (analyze_escalation_pattern)
+    """
+    
+    # Specialized tools - shared by every instance
+    _TOOLS: ClassVar[Tuple[Callable[..., dict], ...]] = (
+        assign_incident_level,
+        detect_duplicate_issues,
+        send_support_email,
+        get_classification_history,
+        analyze_escalation_pattern,
+    )
+    
+    def __init__(self):
         super().__init__(
             name="guard_agent",
             model="gemini-2.0-flash",
             description="Guard Agent with specialized tools for incident management, duplicate detection, and support escalation",
-            instruction=agent_config,
-            tools=tools
+            instruction=_AGENT_CONFIG,
+            tools=list(self._TOOLS)
         )
 
 
+# A2A callback logging: records are queued on the calling thread and written
+# to stdout by a background listener, so callbacks never block on terminal I/O.
+_log_queue = queue.Queue(-1)
+logger = logging.getLogger("guard_agent")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+
 # A2A Protocol Integration
+@dataclass(slots=True, frozen=True)
+class _Alert:
+    """A high-priority classification recorded by the A2A callback handler."""
+    level: int
+    confidence: float
+    timestamp: Optional[str]
+    input_preview: str
+    incident_id: Optional[str]
+
+
+class _MockToolContext:
+    """Minimal stand-in for ToolContext when tools are invoked outside an ADK run."""
+    
+    # The Guard Agent tools only read `state`; `user_id` mirrors the real context
+    __slots__ = ("state", "user_id")
+    
+    def __init__(self, user_id: Optional[str] = None):
+        self.state: Dict[str, Any] = {}
+        self.user_id = user_id
+
+
 class GuardAgentA2ACallback:
     """Callback handler for A2A protocol integration."""
     
+    __slots__ = (
+        "classification_count",
+        "escalation_alerts",
+        "duplicate_checks",
+        "support_emails_sent",
+        "guard_agent_instance",
+    )
+    
     def __init__(self):
         self.classification_count = 0
         self.escalation_alerts = []
@@ -115,48 +163,32 @@ class GuardAgentA2ACallback:
         This is called by the A2A system after a bug report is created.
         """
         try:
-            print(f"[Guard Agent A2A] Starting classification for incident {incident_id}")
-            print(f"[Guard Agent A2A] User input: {user_input[:100]}...")
+            logger.info("[Guard Agent A2A] Starting classification for incident %s", incident_id)
+            logger.info("[Guard Agent A2A] User input: %s...", user_input[:100])
             
             # Create a minimal tool context for classification
-            class MockToolContext:
-                def __init__(self):
-                    self.state = {}
-                    self.user_id = "system"
-                
-                def __getattr__(self, name):
-                    # Return None for any missing attributes to avoid errors
-                    return None
-            
-            mock_context = MockToolContext()
+            mock_context = _MockToolContext("system")
             
             # Use the assign_incident_level tool
             result = assign_incident_level(user_input, incident_id, mock_context)  # type: ignore
             
-            if result.get("status") == "success":
+            status = result.get("status")
+            if status == "success":
                 level = result.get("level", 2)
                 confidence = result.get("confidence", 0.0)
                 reasoning = result.get("reasoning", "")
                 
-                print(f"[Guard Agent A2A] Successfully assigned Level {level} to incident {incident_id}")
-                print(f"[Guard Agent A2A] Confidence: {confidence}, Reasoning: {reasoning}")
+                logger.info("[Guard Agent A2A] Successfully assigned Level %s to incident %s", level, incident_id)
+                logger.info("[Guard Agent A2A] Confidence: %s, Reasoning: %s", confidence, reasoning)
                 
                 # Update internal metrics
-                self.on_classification_complete({
-                    "level": level,
-                    "confidence": confidence,
-                    "timestamp": datetime.now().isoformat(),
-                    "input": user_input,
-                    "incident_id": incident_id
-                })
+                self.on_classification_complete(level, confidence, fast_iso_now(), user_input, incident_id)
                 
             else:
-                print(f"[Guard Agent A2A] Level assignment failed: {result.get('message', 'Unknown error')}")
+                logger.warning("[Guard Agent A2A] Level assignment failed: %s", result.get('message', 'Unknown error'))
                 
         except Exception as e:
-            print(f"[Guard Agent A2A] Error in classify_and_update_incident: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[Guard Agent A2A] Error in classify_and_update_incident: %s", e)
     
     def check_for_duplicates(self, user_input: str, user_id: str) -> Dict[str, Any]:
         """
@@ -164,32 +196,24 @@ class GuardAgentA2ACallback:
         This is called by the pre-agent callback.
         """
         try:
-            print(f"[Guard Agent A2A] Checking for duplicates for user {user_id}")
+            logger.info("[Guard Agent A2A] Checking for duplicates for user %s", user_id)
             self.duplicate_checks += 1
             
             # Create a minimal tool context
-            class MockToolContext:
-                def __init__(self):
-                    self.state = {}
-                    self.user_id = user_id
-                
-                def __getattr__(self, name):
-                    return None
-            
-            mock_context = MockToolContext()
+            mock_context = _MockToolContext(user_id)
             
             # Use the duplicate detection tool
             result = detect_duplicate_issues(user_input, user_id, mock_context)  # type: ignore
             
             if result.get("is_duplicate"):
-                print(f"[Guard Agent A2A] Duplicate detected: {result.get('duplicate_incident_id')}")
+                logger.info("[Guard Agent A2A] Duplicate detected: %s", result.get('duplicate_incident_id'))
             else:
-                print(f"[Guard Agent A2A] No duplicates found - user can proceed")
+                logger.info("[Guard Agent A2A] No duplicates found - user can proceed")
             
             return result
             
         except Exception as e:
-            print(f"[Guard Agent A2A] Error in duplicate check: {e}")
+            logger.error("[Guard Agent A2A] Error in duplicate check: %s", e)
             return {
                 "action": "detect_duplicate_issues",
                 "is_duplicate": False,
@@ -201,47 +225,35 @@ class GuardAgentA2ACallback:
         Handle repeated issues by sending support email.
         """
         try:
-            print(f"[Guard Agent A2A] Handling repeated issue for user {user_id}")
-            
-            class MockToolContext:
-                def __init__(self):
-                    self.state = {}
-                
-                def __getattr__(self, name):
-                    return None
+            logger.info("[Guard Agent A2A] Handling repeated issue for user %s", user_id)
             
-            mock_context = MockToolContext()
+            mock_context = _MockToolContext()
             
             # Use the email notification tool
             result = send_support_email(user_id, user_email, repeated_issue, original_incident_id, mock_context)  # type: ignore
             
             if result.get("status") == "success":
                 self.support_emails_sent += 1
-                print(f"[Guard Agent A2A] Support email sent for repeated issue")
+                logger.info("[Guard Agent A2A] Support email sent for repeated issue")
             else:
-                print(f"[Guard Agent A2A] Failed to send support email: {result.get('message')}")
+                logger.warning("[Guard Agent A2A] Failed to send support email: %s", result.get('message'))
                 
         except Exception as e:
-            print(f"[Guard Agent A2A] Error handling repeated issue: {e}")
+            logger.error("[Guard Agent A2A] Error handling repeated issue: %s", e)
     
-    def on_classification_complete(self, result: Dict[str, Any]) -> None:
+    def on_classification_complete(self, level: int, confidence: float, timestamp: Optional[str] = None,
+                                   user_input: str = "", incident_id: Optional[str] = None) -> None:
         """Called when a classification is completed."""
         self.classification_count += 1
         
         # Log high-priority classifications
-        if result.get("level", 0) >= 4:
-            self.escalation_alerts.append({
-                "level": result["level"],
-                "confidence": result["confidence"],
-                "timestamp": result.get("timestamp"),
-                "input_preview": result.get("input", "")[:50],
-                "incident_id": result.get("incident_id")
-            })
+        if level >= 4:
+            self.escalation_alerts.append(_Alert(level, confidence, timestamp, user_input[:50], incident_id))
     
     def on_escalation_detected(self, analysis: Dict[str, Any]) -> None:
         """Called when escalation pattern is detected."""
         if analysis.get("escalation_detected") or analysis.get("high_level_ratio", 0) > 0.5:
-            print(f"[A2A ALERT] Escalation detected: {analysis['recommendation']}")
+            logger.warning("[A2A ALERT] Escalation detected: %s", analysis.get("recommendation", "<none>"))
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics for A2A reporting."""
@@ -250,7 +262,7 @@ class GuardAgentA2ACallback:
             "duplicate_checks": self.duplicate_checks,
             "support_emails_sent": self.support_emails_sent,
             "escalation_alerts": len(self.escalation_alerts),
-            "recent_alerts": self.escalation_alerts[-5:]  # Last 5 alerts
+            "recent_alerts": [asdict(alert) for alert in self.escalation_alerts[-5:]]  # Last 5 alerts
         }
 
 
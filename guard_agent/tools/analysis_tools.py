@@ -5,14 +5,10 @@ This module contains tools for analyzing classification patterns and retrieving
 historical data for escalation detection and reporting.
 """
 
-import sys
-import os
 from datetime import datetime
 from typing import Dict, Any
 from google.adk.tools.tool_context import ToolContext
 
-# Add the parent directory to the path to import modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from a2a_integration import notify_escalation_detected
 
 
@@ -60,12 +56,12 @@ def analyze_escalation_pattern(tool_context: ToolContext) -> dict:
     # Check for escalation patterns
     if len(levels) >= 3:
         # Check if last 3 classifications show increasing severity
-        last_three = levels[-3:]
-        if last_three == sorted(last_three) and last_three[-1] > last_three[0]:
+        first, middle, last = levels[-3:]
+        if first <= middle <= last and last > first:
             escalation_detected = True
     
     # Check for high-level concentration
-    high_level_count = sum(1 for level in levels if level >= 4)
+    high_level_count = sum(level >= 4 for level in levels)
     high_level_ratio = high_level_count / len(levels) if levels else 0
     
     recommendation = "Continue normal monitoring"
@@ -5,18 +5,41 @@ This tool acts as an agent-as-a-tool to intelligently detect duplicate issues
 from the same user and provide detailed summaries for decision making.
 """
 
-import sys
-import os
-import re
 import sqlite3
-import hashlib
+import threading
+import functools
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, FrozenSet, NamedTuple, Optional
 from google.adk.tools.tool_context import ToolContext
 
-# Add the parent directory to the path to import modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from database import IncidentDatabase
+from database import IncidentDatabase, open_shared_connection
+from issue_features import PHRASE_PATTERNS, create_issue_hash, create_issue_masks
+
+
+_DB_LOCK = threading.Lock()
+
+# Only the columns the duplicate summary needs; served by idx_incidents_user_status
+_OPEN_INCIDENTS_SQL = """
+    SELECT id, description, date_created, status, level, description_lower, description_hash,
+           description_sem_mask, description_phrase_mask FROM incidents 
+    WHERE user_id = ? AND status IN ('Open', 'In Progress')
+    ORDER BY date_created DESC
+"""
+
+# Identical resubmission of an open incident; served by idx_incidents_user_hash
+_EXACT_MATCH_SQL = """
+    SELECT id, description, date_created, status, level, description_lower,
+           description_sem_mask, description_phrase_mask FROM incidents 
+    WHERE user_id = ? AND description_hash = ? AND status IN ('Open', 'In Progress')
+    ORDER BY date_created DESC
+    LIMIT 1
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _get_db_conn() -> sqlite3.Connection:
+    """Open the long-lived read connection for duplicate lookups, shared across threads."""
+    return open_shared_connection(IncidentDatabase().db_path)
 
 
 def detect_duplicate_issues(user_input: str, user_id: str, tool_context: ToolContext) -> dict:
@@ -49,50 +72,49 @@ def detect_duplicate_issues(user_input: str, user_id: str, tool_context: ToolCon
         }
     
     try:
-        db = IncidentDatabase()
+        # Normalize the current input once for every comparison
+        input_features = _issue_features(user_input.lower())
+        current_input_hash = create_issue_hash(user_input)
         
-        # Get all open incidents for this user
-        open_incidents = []
-        with sqlite3.connect(db.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM incidents 
-                WHERE user_id = ? AND status IN ('Open', 'In Progress')
-                ORDER BY date_created DESC
-            """, (user_id,))
+        found_open_incident = False
+        duplicates_found = []
+        
+        with _DB_LOCK:
+            conn = _get_db_conn()
             
-            for row in cursor.fetchall():
-                open_incidents.append(dict(row))
+            # Identical resubmissions are answered by one indexed lookup, skipping the scan
+            exact_match = conn.execute(_EXACT_MATCH_SQL, (user_id, current_input_hash)).fetchone()
+            if exact_match is not None:
+                found_open_incident = True
+                incident_id, description, date_created, status, level, description_lower, sem_mask, phrase_mask = exact_match
+                incident_features = _IssueFeatures(frozenset(description_lower.split()), sem_mask, phrase_mask)
+                similarity_score = _similarity_from_features(input_features, incident_features)
+                duplicates_found.append(
+                    _duplicate_entry(incident_id, description, date_created, status, level, similarity_score)
+                )
+            else:
+                cursor = conn.execute(_OPEN_INCIDENTS_SQL, (user_id,))
+                for (incident_id, description, date_created, status, level, description_lower, existing_hash,
+                     sem_mask, phrase_mask) in cursor:
+                    found_open_incident = True
+                    
+                    # Check for similarity using enhanced methods and the stored feature masks
+                    incident_features = _IssueFeatures(frozenset(description_lower.split()), sem_mask, phrase_mask)
+                    similarity_score = _similarity_from_features(input_features, incident_features)
+                    
+                    # Lowered threshold to 50% and added exact hash matching
+                    if similarity_score > 0.5 or current_input_hash == existing_hash:
+                        duplicates_found.append(
+                            _duplicate_entry(incident_id, description, date_created, status, level, similarity_score)
+                        )
         
-        if not open_incidents:
+        if not found_open_incident:
             return {
                 "action": "detect_duplicate_issues",
                 "is_duplicate": False,
                 "message": "No open incidents found for this user"
             }
         
-        # Create a simplified hash of the current input for comparison
-        current_input_hash = _create_issue_hash(user_input)
-        
-        duplicates_found = []
-        
-        for incident in open_incidents:
-            existing_hash = _create_issue_hash(incident['description'])
-            
-            # Check for similarity using enhanced methods
-            similarity_score = _calculate_enhanced_similarity(user_input.lower(), incident['description'].lower())
-            
-            # Lowered threshold to 50% and added exact hash matching
-            if similarity_score > 0.5 or current_input_hash == existing_hash:
-                duplicates_found.append({
-                    "incident_id": incident['id'],
-                    "description": incident['description'],
-                    "date_created": incident['date_created'],
-                    "status": incident['status'],
-                    "level": incident['level'],
-                    "similarity_score": round(similarity_score, 2)
-                })
-        
         if duplicates_found:
             # Find the most similar incident
             best_match = max(duplicates_found, key=lambda x: x['similarity_score'])
@@ -143,21 +165,42 @@ def detect_duplicate_issues(user_input: str, user_id: str, tool_context: ToolCon
         }
 
 
-def _create_issue_hash(text: str) -> str:
-    """Create a hash of the issue text for comparison."""
-    # Normalize text: lowercase, remove extra spaces, basic words only
-    normalized = re.sub(r'[^\w\s]', '', text.lower())
-    normalized = ' '.join(normalized.split())
-    
-    # Create hash
-    return hashlib.md5(normalized.encode()).hexdigest()[:8]
+def _duplicate_entry(incident_id: str, description: str, date_created: str, status: str,
+                     level: int, similarity_score: float) -> Dict[str, Any]:
+    """Describe an open incident that the current input duplicates."""
+    return {
+        "incident_id": incident_id,
+        "description": description,
+        "date_created": date_created,
+        "status": status,
+        "level": level,
+        "similarity_score": round(similarity_score, 2)
+    }
+
+
+# Phrase mask layout: first sides in the low bits, second sides above them.
+# Stored masks are recomputed by the database whenever FEATURES_VERSION changes.
+_PHRASE_SIDE_SHIFT = len(PHRASE_PATTERNS)
+_PHRASE_FIRST_SIDES = (1 << _PHRASE_SIDE_SHIFT) - 1
+
+
+class _IssueFeatures(NamedTuple):
+    """Per-text inputs to the similarity score, computed once per text."""
+    words: FrozenSet[str]
+    semantic_mask: int
+    phrase_mask: int
+
 
+def _issue_features(text: str) -> _IssueFeatures:
+    """Extract the word set and semantic/phrase masks of lowercased text."""
+    return _IssueFeatures(frozenset(text.split()), *create_issue_masks(text))
 
-def _calculate_enhanced_similarity(text1: str, text2: str) -> float:
-    """Calculate enhanced similarity between two texts with semantic patterns."""
+
+def _similarity_from_features(features1: _IssueFeatures, features2: _IssueFeatures) -> float:
+    """Score two pre-extracted texts; lets one input be compared against many incidents."""
     # Basic word overlap
-    words1 = set(text1.split())
-    words2 = set(text2.split())
+    words1 = features1.words
+    words2 = features2.words
     
     if not words1 or not words2:
         return 0.0
@@ -167,41 +210,17 @@ def _calculate_enhanced_similarity(text1: str, text2: str) -> float:
     union = words1.union(words2)
     base_similarity = len(intersection) / len(union) if union else 0.0
     
-    # Semantic similarity patterns
-    semantic_bonus = 0.0
-    
-    # Define semantic equivalence groups
-    login_terms = {'login', 'signin', 'sign-in', 'log-in', 'access', 'authenticate'}
-    password_terms = {'password', 'pass', 'pwd', 'reset', 'forgot'}
-    account_terms = {'account', 'profile', 'user'}
-    locked_terms = {'locked', 'blocked', 'disabled', 'suspended', 'frozen'}
-    unable_terms = {'unable', 'cannot', 'can\'t', 'failed', 'error', 'issue', 'problem'}
-    game_terms = {'game', 'play', 'gaming', 'playing'}
-    
-    semantic_groups = [login_terms, password_terms, account_terms, locked_terms, unable_terms, game_terms]
-    
-    # Check for semantic matches between groups
-    for group in semantic_groups:
-        group1_match = bool(words1.intersection(group))
-        group2_match = bool(words2.intersection(group))
-        
-        if group1_match and group2_match:
-            semantic_bonus += 0.3  # 30% bonus for each semantic group match
+    # Semantic similarity patterns: 30% per shared semantic group
+    semantic_matches = (features1.semantic_mask & features2.semantic_mask).bit_count()
     
-    # Common phrase patterns
-    phrase_patterns = [
-        (['cannot', 'login'], ['unable', 'access']),
-        (['password', 'reset'], ['forgot', 'password']),
-        (['account', 'locked'], ['cannot', 'access']),
-        (['unable', 'play'], ['game', 'not', 'working']),
-        (['doxxing', 'user'], ['user', 'information', 'exposed']),
-    ]
+    # 40% per phrase pattern whose sides appear one in each text
+    first1 = features1.phrase_mask & _PHRASE_FIRST_SIDES
+    first2 = features2.phrase_mask & _PHRASE_FIRST_SIDES
+    second1 = features1.phrase_mask >> _PHRASE_SIDE_SHIFT
+    second2 = features2.phrase_mask >> _PHRASE_SIDE_SHIFT
+    phrase_matches = ((first1 & second2) | (first2 & second1)).bit_count()
     
-    for pattern1, pattern2 in phrase_patterns:
-        if all(word in text1 for word in pattern1) and all(word in text2 for word in pattern2):
-            semantic_bonus += 0.4  # 40% bonus for phrase pattern matches
-        elif all(word in text2 for word in pattern1) and all(word in text1 for word in pattern2):
-            semantic_bonus += 0.4
+    semantic_bonus = 0.3 * semantic_matches + 0.4 * phrase_matches
     
     # Calculate final similarity (cap at 1.0)
     final_similarity = min(1.0, base_similarity + semantic_bonus)
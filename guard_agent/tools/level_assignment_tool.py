@@ -5,18 +5,114 @@ This tool is responsible for classifying user input and assigning appropriate
 severity levels (1-5) to incidents based on keyword and pattern analysis.
 """
 
-import sys
-import os
-import re
-import sqlite3
-from datetime import datetime
+import atexit
+import queue
+import threading
+import functools
+from typing import Any, Dict, List, Optional, Tuple
 from google.adk.tools.tool_context import ToolContext
 
-# Add the parent directory to the path to import modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from config import get_bug_levels, get_default_level
 from a2a_integration import notify_classification_complete
-from database import IncidentDatabase
+from .._classify_core import classify_core
+from .._timestamps import fast_iso_now
+
+
+# Level configuration is static for the life of the process
+_BUG_LEVELS = get_bug_levels()
+_DEFAULT_LEVEL = get_default_level()
+
+_DB_LOCK = threading.Lock()
+
+# Classification only needs the leading context; bounds the work for pasted logs
+_MAX_INPUT_LEN = 2048
+
+# Kept as one constant so the connection's statement cache reuses the prepared UPDATE
+_UPDATE_LEVEL_SQL = """
+    UPDATE incidents 
+    SET level = ?, last_updated = ?
+    WHERE id = ?
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _get_db_conn():
+    """
+    Open the long-lived autocommit connection for level updates, shared across threads.
+    Created on the first update so classify-only callers never touch the database.
+    """
+    from database import IncidentDatabase, open_shared_connection
+    
+    return open_shared_connection(IncidentDatabase().db_path)
+
+
+def _resolve_level(top_level: int, max_score: float) -> Tuple[int, float, str]:
+    """Turn the top classifier score into (level, confidence, reasoning)."""
+    if max_score == 0:
+        return _DEFAULT_LEVEL, 0.3, "No clear indicators found, defaulting to level 2"
+    confidence = min(max_score / 5.0, 1.0)
+    return top_level, confidence, f"Classified based on keyword and pattern analysis (score: {max_score})"
+
+
+# Classification results waiting to be published over A2A
+_NOTIFY_QUEUE: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+
+
+# Put on the queue at exit; the worker stops once everything queued before it is published
+_STOP_NOTIFIER = None
+
+
+def _notify_worker() -> None:
+    """Publish queued classification results; a failing listener never stops the worker."""
+    while True:
+        classification_data = _NOTIFY_QUEUE.get()
+        if classification_data is _STOP_NOTIFIER:
+            return
+        try:
+            notify_classification_complete(classification_data)
+        except Exception as e:
+            print(f"[Level Assignment Tool] A2A notification failed: {e}")
+
+
+_notifier = threading.Thread(target=_notify_worker, name="classification-notifier", daemon=True)
+_notifier.start()
+
+
+def _stop_notifier() -> None:
+    """Drain the pending notifications at interpreter exit instead of dropping them."""
+    _NOTIFY_QUEUE.put(_STOP_NOTIFIER)
+    _notifier.join()
+
+
+atexit.register(_stop_notifier)
+
+
+def _dispatch_classification(classification_data: Dict[str, Any]) -> None:
+    """Hand a classification result to the background A2A publisher."""
+    _NOTIFY_QUEUE.put(classification_data)
+
+
+def classify_batch(user_inputs: List[str]) -> List[Dict[str, Any]]:
+    """
+    Classify many inputs at once without updating the database or session state.
+    Intended for bulk re-scoring of historical reports; single incidents go
+    through assign_incident_level.
+    
+    Args:
+        user_inputs: The texts to classify
+        
+    Returns:
+        One dictionary per input with level, confidence and reasoning
+    """
+    results = []
+    for user_input in user_inputs:
+        level, confidence, reasoning = _resolve_level(*classify_core(user_input[:_MAX_INPUT_LEN].lower()))
+        results.append({
+            "level": level,
+            "confidence": round(confidence, 2),
+            "reasoning": reasoning
+        })
+    return results
 
 
 def assign_incident_level(user_input: str, incident_id: str, tool_context: ToolContext) -> dict:
@@ -48,152 +144,29 @@ def assign_incident_level(user_input: str, incident_id: str, tool_context: ToolC
             "message": "No incident ID provided"
         }
     
-    input_lower = user_input.lower()
-    
-    # Level 5: Critical emergencies (doxxing, legal issues, server outages)
-    level_5_keywords = [
-        "doxx", "dox", "personal info", "address leak", "phone number leak",
-        "legal", "lawsuit", "court", "police", "attorney", "lawyer",
-        "server down", "complete outage", "total failure", "system crash",
-        "data breach", "hack", "hacked", "stolen data", "privacy violation",
-        "emergency", "urgent", "critical", "immediate help"
-    ]
-    
-    level_5_patterns = [
-        r"server.*down", r"complete.*outage", r"total.*failure",
-        r"data.*breach", r"personal.*information.*leaked",
-        r"legal.*action", r"court.*case", r"emergency.*situation"
-    ]
-    
-    # Level 4: Security/fraud issues (hacking, stolen items)  
-    level_4_keywords = [
-        "hack", "hacker", "compromised", "stolen", "fraud", "scam",
-        "unauthorized", "suspicious activity", "account taken",
-        "password changed", "logged out", "can't login", "security",
-        "malware", "virus", "phishing", "suspicious email"
-    ]
-    
-    level_4_patterns = [
-        r"account.*compromised", r"password.*changed.*me",
-        r"suspicious.*activity", r"unauthorized.*access",
-        r"can't.*log.*in", r"logged.*out.*automatically"
-    ]
-    
-    # Level 3: Unstructured but solvable problems (save corruption, gameplay issues)
-    level_3_keywords = [
-        "save", "corrupt", "progress lost", "game crash", "freeze", "lag",
-        "performance", "slow", "bug", "glitch", "error", "broken",
-        "not working", "weird", "strange behavior", "unexpected"
-    ]
-    
-    level_3_patterns = [
-        r"save.*corrupt", r"progress.*lost", r"game.*crash",
-        r"not.*working.*properly", r"weird.*behavior", r"strange.*issue"
-    ]
-    
-    # Level 2: Common technical/account issues (crashes, login problems)
-    level_2_keywords = [
-        "crash", "login", "sign in", "password", "reset", "forgot",
-        "technical", "support", "help", "issue", "problem",
-        "won't start", "loading", "connection", "sync"
-    ]
-    
-    level_2_patterns = [
-        r"can't.*login", r"forgot.*password", r"won't.*start",
-        r"loading.*problem", r"connection.*issue", r"sync.*problem"
-    ]
-    
-    # Level 1: Simple FAQ questions (how-to, information requests)
-    level_1_keywords = [
-        "how", "what", "when", "where", "why", "explain", "tell me",
-        "information", "guide", "tutorial", "help", "learn",
-        "feature", "function", "work", "use", "setup"
-    ]
-    
-    level_1_patterns = [
-        r"how.*do.*i", r"how.*to", r"what.*is", r"how.*does.*work",
-        r"can.*you.*explain", r"tell.*me.*about", r"information.*about"
-    ]
+    input_lower = user_input[:_MAX_INPUT_LEN].lower()
     
-    # Classification logic with scoring
-    level_scores = {1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0, 5: 0.0}
-    
-    # Check Level 5 first (highest priority)
-    for keyword in level_5_keywords:
-        if keyword in input_lower:
-            level_scores[5] += 3.0
-    
-    for pattern in level_5_patterns:
-        if re.search(pattern, input_lower):
-            level_scores[5] += 4.0
-    
-    # Check Level 4
-    for keyword in level_4_keywords:
-        if keyword in input_lower:
-            level_scores[4] += 2.5
-    
-    for pattern in level_4_patterns:
-        if re.search(pattern, input_lower):
-            level_scores[4] += 3.0
-    
-    # Check Level 3
-    for keyword in level_3_keywords:
-        if keyword in input_lower:
-            level_scores[3] += 2.0
-    
-    for pattern in level_3_patterns:
-        if re.search(pattern, input_lower):
-            level_scores[3] += 2.5
-    
-    # Check Level 2
-    for keyword in level_2_keywords:
-        if keyword in input_lower:
-            level_scores[2] += 1.5
-    
-    for pattern in level_2_patterns:
-        if re.search(pattern, input_lower):
-            level_scores[2] += 2.0
-    
-    # Check Level 1
-    for keyword in level_1_keywords:
-        if keyword in input_lower:
-            level_scores[1] += 1.0
-    
-    for pattern in level_1_patterns:
-        if re.search(pattern, input_lower):
-            level_scores[1] += 1.5
+    # Score keywords and patterns
+    top_level, max_score = classify_core(input_lower)
     
     # Determine final level
-    max_score = max(level_scores.values())
-    if max_score == 0:
-        final_level = get_default_level()
-        confidence = 0.3
-        reasoning = "No clear indicators found, defaulting to level 2"
-    else:
-        final_level = max(level_scores.keys(), key=lambda k: level_scores[k])
-        confidence = min(max_score / 5.0, 1.0)
-        reasoning = f"Classified based on keyword and pattern analysis (score: {max_score})"
+    final_level, confidence, reasoning = _resolve_level(top_level, max_score)
     
     # Update the incident level in the database
     try:
-        db = IncidentDatabase()
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.execute("""
-                UPDATE incidents 
-                SET level = ?, last_updated = ?
-                WHERE id = ?
-            """, (final_level, datetime.now().isoformat(), incident_id))
-            
-            if cursor.rowcount == 0:
-                return {
-                    "action": "assign_incident_level",
-                    "status": "error",
-                    "message": f"Incident {incident_id} not found"
-                }
-            
-            conn.commit()
+        timestamp = fast_iso_now()
+        with _DB_LOCK:
+            cursor = _get_db_conn().execute(_UPDATE_LEVEL_SQL, (final_level, timestamp, incident_id))
+            updated_rows = cursor.rowcount
+        
+        if updated_rows == 0:
+            return {
+                "action": "assign_incident_level",
+                "status": "error",
+                "message": f"Incident {incident_id} not found"
+            }
         
-        level_description = get_bug_levels().get(final_level, "Unknown level")
+        level_description = _BUG_LEVELS.get(final_level, "Unknown level")
         
         # Store classification result
         classification_data = {
@@ -201,19 +174,18 @@ def assign_incident_level(user_input: str, incident_id: str, tool_context: ToolC
             "level": final_level,
             "confidence": confidence,
             "reasoning": reasoning,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
         
-        # Add to classification history
+        # Add to classification history, trimming in place to the last 20 records
         history = tool_context.state.get("classification_history", [])
         history.append(classification_data)
-        tool_context.state["classification_history"] = history[-20:]
+        if len(history) > 20:
+            del history[:-20]
+        tool_context.state["classification_history"] = history
         
         # Notify A2A protocol
-        try:
-            notify_classification_complete(classification_data)
-        except Exception as e:
-            print(f"[Level Assignment Tool] A2A notification failed: {e}")
+        _dispatch_classification(classification_data)
         
         return {
             "action": "assign_incident_level",
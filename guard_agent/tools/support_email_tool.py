@@ -5,8 +5,6 @@ This tool sends email notifications to the support team about repeated issues
 after the original incident was marked as resolved.
 """
 
-import sys
-import os
 import smtplib
 from datetime import datetime
 from typing import Dict, Any
@@ -14,8 +12,6 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from google.adk.tools.tool_context import ToolContext
 
-# Add parent directory to path to import config
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from config import get_email_config, get_support_email, get_sender_email, is_email_enabled
 
 
@@ -0,0 +1,85 @@
+"""
+Issue Text Features
+
+Normalization and fingerprinting of incident descriptions. Shared by the
+incident database, which stores the results at insert time, and the Guard
+Agent's duplicate detection, which compares new input against them.
+"""
+
+import re
+import zlib
+from typing import Tuple
+
+
+# Characters stripped before hashing an issue description
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+# Same deletion for pure-ASCII text as a C-level translate table, derived from _PUNCT_RE
+_ASCII_PUNCT_TABLE = str.maketrans('', '', ''.join(chr(c) for c in range(128) if _PUNCT_RE.match(chr(c))))
+
+
+def create_issue_hash(text: str) -> str:
+    """Create a hash of the issue text for comparison."""
+    # Normalize text: lowercase, remove extra spaces, basic words only
+    text_lower = text.lower()
+    if text_lower.isascii():
+        normalized = text_lower.translate(_ASCII_PUNCT_TABLE)
+    else:
+        normalized = _PUNCT_RE.sub('', text_lower)
+    normalized = ' '.join(normalized.split())
+    
+    # Non-cryptographic 32-bit hash; only used for equality checks
+    return f"{zlib.crc32(normalized.encode()):08x}"
+
+
+# Semantic equivalence groups
+SEMANTIC_GROUPS = (
+    frozenset({'login', 'signin', 'sign-in', 'log-in', 'access', 'authenticate'}),
+    frozenset({'password', 'pass', 'pwd', 'reset', 'forgot'}),
+    frozenset({'account', 'profile', 'user'}),
+    frozenset({'locked', 'blocked', 'disabled', 'suspended', 'frozen'}),
+    frozenset({'unable', 'cannot', 'can\'t', 'failed', 'error', 'issue', 'problem'}),
+    frozenset({'game', 'play', 'gaming', 'playing'}),
+)
+
+# Common phrase patterns; each side matches when all of its words occur in the text
+PHRASE_PATTERNS = (
+    (('cannot', 'login'), ('unable', 'access')),
+    (('password', 'reset'), ('forgot', 'password')),
+    (('account', 'locked'), ('cannot', 'access')),
+    (('unable', 'play'), ('game', 'not', 'working')),
+    (('doxxing', 'user'), ('user', 'information', 'exposed')),
+)
+
+# Identifies the mask bit layout, which follows the order of the definitions above.
+# Stored with each incident's masks so rows computed under older definitions are
+# recomputed instead of being compared bit-for-bit against the new layout.
+FEATURES_VERSION = zlib.crc32(repr((
+    tuple(tuple(sorted(group)) for group in SEMANTIC_GROUPS),
+    PHRASE_PATTERNS,
+)).encode())
+
+
+def create_issue_masks(text_lower: str) -> Tuple[int, int]:
+    """
+    Encode which semantic groups and phrase-pattern sides occur in lowercased text.
+    
+    Returns:
+        Tuple of (semantic mask with bit i set for group i, phrase mask with bit i
+        set for the first side of pattern i and bit i + len(PHRASE_PATTERNS) for
+        its second side)
+    """
+    words = set(text_lower.split())
+    semantic_mask = 0
+    for i, group in enumerate(SEMANTIC_GROUPS):
+        if not words.isdisjoint(group):
+            semantic_mask |= 1 << i
+    
+    phrase_mask = 0
+    for i, (first, second) in enumerate(PHRASE_PATTERNS):
+        if all(word in text_lower for word in first):
+            phrase_mask |= 1 << i
+        if all(word in text_lower for word in second):
+            phrase_mask |= 1 << (i + len(PHRASE_PATTERNS))
+    
+    return semantic_mask, phrase_mask
\ No newline at end of file
@@ -1,23 +1,16 @@
 import asyncio
+import sqlite3
+import sys
+import threading
+from typing import Optional
 
 from dotenv import load_dotenv
-from google.adk.runners import Runner
-from google.adk.sessions import DatabaseSessionService
-from bug_reporting_agent.agent import bug_reporting_agent, set_guard_agent_callback, get_bug_reporting_callbacks
-from guard_agent.agent import GuardAgent, _guard_agent_a2a_callback
-from utils import call_agent_async, call_agent_async_with_callbacks
-from config import get_database_name, get_default_user_id, AGENT_CONFIG
-from a2a_integration import initialize_a2a_agents, register_guard_agent_callback
+from config import get_database_name, get_default_user_id
 
 load_dotenv()
 
-# ===== PART 1: Initialize Persistent Session Service =====
-# Using SQLite database for persistent storage
-db_url = f"sqlite:///./{get_database_name()}"
-session_service = DatabaseSessionService(db_url=db_url)
 
-
-# ===== PART 2: Define Initial State =====
+# ===== PART 1: Define Initial State =====
 # This will only be used when creating a new session
 initial_state = {
     "user_name": "",
@@ -27,7 +20,78 @@ initial_state = {
 }
 
 
+async def get_latest_session_id(session_service, app_name: str, user_id: str) -> Optional[str]:
+    """Return the id of the user's most recently updated session, or None if there is none."""
+    try:
+        # Single indexed row instead of loading every session the user has
+        with sqlite3.connect(get_database_name()) as conn:
+            row = conn.execute("""
+                SELECT id FROM sessions
+                WHERE app_name = ? AND user_id = ?
+                ORDER BY update_time DESC
+                LIMIT 1
+            """, (app_name, user_id)).fetchone()
+        return row[0] if row else None
+    except sqlite3.Error:
+        # Session table layout not as expected - ask the session service instead
+        existing_sessions = await session_service.list_sessions(app_name=app_name, user_id=user_id)
+        if existing_sessions and len(existing_sessions.sessions) > 0:
+            return existing_sessions.sessions[0].id
+        return None
+
+
+async def read_user_input(prompt: str) -> str:
+    """
+    Read a line from stdin without blocking the event loop.
+    
+    The line is read on its own daemon thread rather than with asyncio.to_thread:
+    the default executor is joined at shutdown, so a prompt still waiting for a
+    line would keep Ctrl-C and interpreter exit from completing. The thread reads
+    the unbuffered stream, which holds no lock the interpreter needs at exit.
+    
+    This must be the only reader of stdin: anything already buffered by sys.stdin
+    (e.g. by an earlier input() call) is never seen by the unbuffered stream.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def resolve(line: bytes) -> None:
+        if future.done():
+            return  # The awaiting task was cancelled
+        if not line:
+            future.set_exception(EOFError())
+        else:
+            # Strip "\r\n" as well as "\n"; the raw stream does no newline translation
+            text = line.decode(sys.stdin.encoding, sys.stdin.errors)
+            future.set_result(text.rstrip("\r\n"))
+    
+    def read() -> None:
+        line = sys.stdin.buffer.raw.readline()
+        try:
+            loop.call_soon_threadsafe(resolve, line)
+        except RuntimeError:
+            pass  # Event loop already closed
+    
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    threading.Thread(target=read, name="stdin-reader", daemon=True).start()
+    return await future
+
+
 async def main_async():
+    # The ADK and both agents are imported here so startup checks stay cheap
+    from google.adk.runners import Runner
+    from google.adk.sessions import DatabaseSessionService
+    from bug_reporting_agent.agent import bug_reporting_agent, set_guard_agent_callback
+    from guard_agent.agent import _guard_agent_a2a_callback
+    from utils import call_agent_async_with_callbacks
+    from a2a_integration import initialize_a2a_agents, register_guard_agent_callback
+    
+    # ===== PART 2: Initialize Persistent Session Service =====
+    # Using SQLite database for persistent storage
+    db_url = f"sqlite:///./{get_database_name()}"
+    session_service = DatabaseSessionService(db_url=db_url)
+    
     # Setup constants from config
     APP_NAME = "Bug Reporting Agent"
     USER_ID = get_default_user_id()
@@ -43,16 +107,13 @@ async def main_async():
     print("✅ Bug Reporting Agent callbacks configured")
 
     # ===== PART 3: Session Management - Find or Create =====
-    # Check for existing sessions for this user
-    existing_sessions = await session_service.list_sessions(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-    )
+    # Check for the most recent session for this user
+    latest_session_id = await get_latest_session_id(session_service, APP_NAME, USER_ID)
 
     # If there's an existing session, use it, otherwise create a new one
-    if existing_sessions and len(existing_sessions.sessions) > 0:
+    if latest_session_id:
         # Use the most recent session
-        SESSION_ID = existing_sessions.sessions[0].id
+        SESSION_ID = latest_session_id
         print(f"Continuing existing session: {SESSION_ID}")
     else:
         # Create a new session with initial state
@@ -66,7 +127,7 @@ async def main_async():
         print(f"Created new session: {SESSION_ID}")
     
     # Ensure user_id is stored in existing session state as well
-    if existing_sessions and len(existing_sessions.sessions) > 0:
+    if latest_session_id:
         session = await session_service.get_session(
             app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
         )
@@ -89,8 +150,8 @@ async def main_async():
     print("Type 'exit' or 'quit' to end the conversation.\n")
 
     while True:
-        # Get user input
-        user_input = input("You: ")
+        # Get user input without blocking the event loop (the only stdin reader)
+        user_input = await read_user_input("You: ")
 
         # Check if user wants to exit
         if user_input.lower() in ["exit", "quit"]:
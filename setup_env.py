@@ -39,30 +39,35 @@ def setup_environment():
     
     # Prompt for essential settings
     print("\n📝 Essential Configuration (press Enter to skip):")
+    updates = {}
     
     # Google API Key
     api_key = input("Google API Key (required): ").strip()
     if api_key:
-        update_env_file(env_file, "GOOGLE_API_KEY", api_key)
+        updates["GOOGLE_API_KEY"] = api_key
     
     # Email settings
     print("\n📧 Email Configuration:")
     support_email = input("Support team email: ").strip()
     if support_email:
-        update_env_file(env_file, "SUPPORT_EMAIL", support_email)
+        updates["SUPPORT_EMAIL"] = support_email
     
     sender_email = input("Sender email: ").strip()
     if sender_email:
-        update_env_file(env_file, "EMAIL_USER", sender_email)
+        updates["EMAIL_USER"] = sender_email
     
     enable_email = input("Enable email notifications? (y/N): ").lower().strip()
     if enable_email == 'y':
-        update_env_file(env_file, "EMAIL_ENABLED", "true")
+        updates["EMAIL_ENABLED"] = "true"
     
     # Debug mode
     debug_mode = input("Enable debug mode? (y/N): ").lower().strip()
     if debug_mode == 'y':
-        update_env_file(env_file, "DEBUG", "true")
+        updates["DEBUG"] = "true"
+    
+    # Write all answers in a single pass over the file
+    if updates:
+        update_env_entries(env_file, updates)
     
     print("\n✅ Environment setup complete!")
     print(f"📁 Configuration saved to: {env_file.absolute()}")
@@ -71,22 +76,19 @@ def setup_environment():
     print("2. Ensure GOOGLE_API_KEY is set for the system to work")
     print("3. Run: python main.py")
 
-def update_env_file(env_file: Path, key: str, value: str):
-    """Update a specific key in the .env file."""
-    lines = []
-    key_found = False
-    
+def update_env_entries(env_file: Path, updates: dict):
+    """Update several keys in the .env file with one read and one write."""
     with open(env_file, 'r') as f:
         lines = f.readlines()
     
-    # Update existing key or add new one
+    # Update existing keys or add new ones
+    pending = dict(updates)
     for i, line in enumerate(lines):
-        if line.strip().startswith(f"{key}="):
-            lines[i] = f"{key}={value}\n"
-            key_found = True
-            break
+        key = line.strip().split("=", 1)[0]
+        if "=" in line and key in pending:
+            lines[i] = f"{key}={pending.pop(key)}\n"
     
-    if not key_found:
+    for key, value in pending.items():
         lines.append(f"{key}={value}\n")
     
     with open(env_file, 'w') as f:
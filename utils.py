@@ -1,5 +1,19 @@
+import asyncio
+import re
+import sys
 from google.genai import types
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, TextIO
+
+
+# Incident ID quoted in an agent response
+_BUG_ID_RE = re.compile(r'BUG-\d+')
+
+# Phrases that mark a response as a successful bug report creation, in either order
+_BUG_REPORT_RE = re.compile(r'bug report', re.IGNORECASE)
+_CREATED_RE = re.compile(r'created successfully', re.IGNORECASE)
+
+# Status icons shown in the bug report table; unknown statuses get "⚫"
+_STATUS_ICON = {"Open": "🔴", "In Progress": "🟡", "Resolved": "🟢"}
 
 
 def format_bug_reports_table(bug_reports: List[Dict[str, Any]]) -> str:
@@ -7,63 +21,77 @@ def format_bug_reports_table(bug_reports: List[Dict[str, Any]]) -> str:
     if not bug_reports:
         return "No bug reports found."
     
+    # Combine all parts
+    return "\n".join(_bug_report_table_lines(bug_reports))
+
+
+def write_bug_reports_table(bug_reports: List[Dict[str, Any]], out: TextIO) -> None:
+    """Write the bug reports table to a text stream line by line, without building the whole table."""
+    if not bug_reports:
+        out.write("No bug reports found.\n")
+        return
+    
+    write = out.write
+    for line in _bug_report_table_lines(bug_reports):
+        write(line + "\n")
+
+
+def _bug_report_table_lines(bug_reports: List[Dict[str, Any]]) -> Iterator[str]:
+    """Yield the lines of the bug reports table; bug_reports must not be empty."""
     # Define column headers and widths
     headers = ["ID", "Category", "Status", "Date Observed", "Date Created", "Description"]
     col_widths = [10, 12, 12, 12, 12, 50]  # Minimum widths
     
     # Calculate actual column widths based on content
-    for report in bug_reports:
-        col_widths[0] = max(col_widths[0], len(str(report.get("id", ""))))
-        col_widths[1] = max(col_widths[1], len(str(report.get("category", ""))))
-        col_widths[2] = max(col_widths[2], len(str(report.get("status", ""))))
-        col_widths[3] = max(col_widths[3], len(str(report.get("date_observed", ""))))
-        col_widths[4] = max(col_widths[4], len(str(report.get("date_created", ""))[:10]))  # Only date part
-        # Description is truncated to max 50 chars
-        
+    col_widths[0] = max(col_widths[0], max(len(str(report.get("id", ""))) for report in bug_reports))
+    col_widths[1] = max(col_widths[1], max(len(str(report.get("category", ""))) for report in bug_reports))
+    col_widths[2] = max(col_widths[2], max(len(str(report.get("status", ""))) for report in bug_reports))
+    col_widths[3] = max(col_widths[3], max(len(str(report.get("date_observed", ""))) for report in bug_reports))
+    col_widths[4] = max(col_widths[4], max(len(str(report.get("date_created", ""))[:10]) for report in bug_reports))  # Only date part
+    # Description is truncated to max 50 chars
+    
+    # Build the row templates once now that the widths are known
+    header_fmt = "│" + "".join(f" {{:<{width}}} │" for width in col_widths)
+    status_width = col_widths[2] + 2  # +2 for emoji
+    row_fmt = (f"│ {{:<{col_widths[0]}}} │ {{:<{col_widths[1]}}} │ {{:<{status_width}}} │"
+               f" {{:<{col_widths[3]}}} │ {{:<{col_widths[4]}}} │ {{:<{col_widths[5]}}} │")
+    description_width = col_widths[5]
+    
+    # Horizontal border segments, shared by the top, separator and bottom lines
+    segments = ["─" * (width + 2) for width in col_widths]
+    
     # Create table header
-    header_row = "┌" + "┬".join("─" * (width + 2) for width in col_widths) + "┐"
-    header_text = "│"
-    for i, header in enumerate(headers):
-        header_text += f" {header:<{col_widths[i]}} │"
+    header_row = "┌" + "┬".join(segments) + "┐"
+    header_text = header_fmt.format(*headers)
+    
+    separator = "├" + "┼".join(segments) + "┤"
     
-    separator = "├" + "┼".join("─" * (width + 2) for width in col_widths) + "┤"
+    yield header_row
+    yield header_text
+    yield separator
     
     # Create table rows
-    rows = []
     for report in bug_reports:
-        row = "│"
-        
         # Format each column
-        bug_id = str(report.get("id", ""))
-        category = str(report.get("category", ""))
-        status = str(report.get("status", ""))
-        date_obs = str(report.get("date_observed", ""))
-        date_created = str(report.get("date_created", ""))[:10]  # Only date part
-        description = str(report.get("description", ""))
+        get = report.get
+        bug_id = str(get("id", ""))
+        category = str(get("category", ""))
+        status = str(get("status", ""))
+        date_obs = str(get("date_observed", ""))
+        date_created = str(get("date_created", ""))[:10]  # Only date part
+        description = str(get("description", ""))
         
         # Truncate description if too long
-        if len(description) > col_widths[5]:
-            description = description[:col_widths[5]-3] + "..."
+        if len(description) > description_width:
+            description = description[:description_width-3] + "..."
         
         # Add status icon
-        status_icon = "🔴" if status == "Open" else "🟡" if status == "In Progress" else "🟢" if status == "Resolved" else "⚫"
-        status_with_icon = f"{status_icon} {status}"
-        
-        row += f" {bug_id:<{col_widths[0]}} │"
-        row += f" {category:<{col_widths[1]}} │"
-        row += f" {status_with_icon:<{col_widths[2]+2}} │"  # +2 for emoji
-        row += f" {date_obs:<{col_widths[3]}} │"
-        row += f" {date_created:<{col_widths[4]}} │"
-        row += f" {description:<{col_widths[5]}} │"
+        status_with_icon = f"{_STATUS_ICON.get(status, '⚫')} {status}"
         
-        rows.append(row)
+        yield row_fmt.format(bug_id, category, status_with_icon, date_obs, date_created, description)
     
     # Create table footer
-    footer = "└" + "┴".join("─" * (width + 2) for width in col_widths) + "┘"
-    
-    # Combine all parts
-    table = [header_row, header_text, separator] + rows + [footer]
-    return "\n".join(table)
+    yield "└" + "┴".join(segments) + "┘"
 
 
 # ANSI color codes for terminal output
@@ -93,6 +121,18 @@ class Colors:
     BG_WHITE = "\033[47m"
 
 
+# Rule around the display_state label
+_DASH10 = "-" * 10
+
+# Constant banner pieces, formatted once instead of on every event
+_FINAL_BANNER_TOP = f"{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╔══ BUG REPORTING AGENT ═══════════════════════════════════{Colors.RESET}"
+_FINAL_BANNER_BOTTOM = f"{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╚════════════════════════════════════════════════════════════{Colors.RESET}"
+_RESPONSE_TEXT_FMT = f"{Colors.CYAN}{Colors.BOLD}{{}}{Colors.RESET}"
+_NO_TEXT_BANNER = f"\n{Colors.BG_RED}{Colors.WHITE}{Colors.BOLD}==> Final Agent Response: [No text content in final event]{Colors.RESET}\n\n"
+_PROCESSING_FMT = f"\n{Colors.BG_GREEN}{Colors.BLACK}{Colors.BOLD}--- Processing: {{query}} ---{Colors.RESET}"
+_PROCESSING_WITH_CALLBACKS_FMT = f"\n{Colors.BG_GREEN}{Colors.BLACK}{Colors.BOLD}--- Processing with Callbacks: {{query}} ---{Colors.RESET}"
+
+
 async def display_state(
     session_service, app_name, user_id, session_id, label="Current State"
 ):
@@ -102,19 +142,20 @@ async def display_state(
             app_name=app_name, user_id=user_id, session_id=session_id
         )
 
-        # Format the output with clear sections
-        print(f"\n{'-' * 10} {label} {'-' * 10}")
-
         # Handle the user info
         user_name = session.state.get("user_name", "Not provided")
         user_email = session.state.get("user_email", "Not provided")
-        print(f"👤 User: {user_name}")
-        print(f"📧 Email: {user_email}")
 
         # Note: Bug reports table removed from state display as requested
         # Users can view reports by asking "show my bug reports"
 
-        print("-" * (22 + len(label)))
+        # Format the output with clear sections, written in one go
+        sys.stdout.write(
+            f"\n{_DASH10} {label} {_DASH10}\n"
+            f"👤 User: {user_name}\n"
+            f"📧 Email: {user_email}\n"
+            f"{'-' * (22 + len(label))}\n"
+        )
     except Exception as e:
         print(f"Error displaying state: {e}")
 
@@ -128,25 +169,36 @@ async def process_agent_response(event):
     has_specific_part = False
     if event.content and event.content.parts:
         for part in event.content.parts:
-            if hasattr(part, "executable_code") and part.executable_code:
+            # Resolve each optional attribute once instead of hasattr() plus a second lookup
+            executable_code = getattr(part, "executable_code", None)
+            if executable_code:
                 # Access the actual code string via .code
                 print(
-                    f"  Debug: Agent generated code:\n```python\n{part.executable_code.code}\n```"
+                    f"  Debug: Agent generated code:\n```python\n{executable_code.code}\n```"
                 )
                 has_specific_part = True
-            elif hasattr(part, "code_execution_result") and part.code_execution_result:
+                continue
+            
+            code_execution_result = getattr(part, "code_execution_result", None)
+            if code_execution_result:
                 # Access outcome and output correctly
                 print(
-                    f"  Debug: Code Execution Result: {part.code_execution_result.outcome} - Output:\n{part.code_execution_result.output}"
+                    f"  Debug: Code Execution Result: {code_execution_result.outcome} - Output:\n{code_execution_result.output}"
                 )
                 has_specific_part = True
-            elif hasattr(part, "tool_response") and part.tool_response:
+                continue
+            
+            tool_response = getattr(part, "tool_response", None)
+            if tool_response:
                 # Print tool response information
-                print(f"  Tool Response: {part.tool_response.output}")
+                print(f"  Tool Response: {tool_response.output}")
                 has_specific_part = True
+                continue
+            
             # Also print any text parts found in any event for debugging
-            elif hasattr(part, "text") and part.text and not part.text.isspace():
-                print(f"  Text: '{part.text.strip()}'")
+            text = getattr(part, "text", None)
+            if text and not text.isspace():
+                print(f"  Text: '{text.strip()}'")
 
     # Check for final response after specific parts
     final_response = None
@@ -158,18 +210,12 @@ async def process_agent_response(event):
             and event.content.parts[0].text
         ):
             final_response = event.content.parts[0].text.strip()
-            # Use colors and formatting to make the final response stand out
-            print(
-                f"\n{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╔══ BUG REPORTING AGENT ═══════════════════════════════════{Colors.RESET}"
-            )
-            print(f"{Colors.CYAN}{Colors.BOLD}{final_response}{Colors.RESET}")
-            print(
-                f"{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╚════════════════════════════════════════════════════════════{Colors.RESET}\n"
+            # Use colors and formatting to make the final response stand out; one write for the whole banner
+            sys.stdout.write(
+                f"\n{_FINAL_BANNER_TOP}\n{_RESPONSE_TEXT_FMT.format(final_response)}\n{_FINAL_BANNER_BOTTOM}\n\n"
             )
         else:
-            print(
-                f"\n{Colors.BG_RED}{Colors.WHITE}{Colors.BOLD}==> Final Agent Response: [No text content in final event]{Colors.RESET}\n"
-            )
+            sys.stdout.write(_NO_TEXT_BANNER)
 
     return final_response
 
@@ -177,9 +223,7 @@ async def process_agent_response(event):
 async def call_agent_async(runner, user_id, session_id, query):
     """Call the agent asynchronously with the user's query."""
     content = types.Content(role="user", parts=[types.Part(text=query)])
-    print(
-        f"\n{Colors.BG_GREEN}{Colors.BLACK}{Colors.BOLD}--- Processing: {query} ---{Colors.RESET}"
-    )
+    print(_PROCESSING_FMT.format(query=query))
     final_response_text = None
 
     # State display removed as requested
@@ -200,17 +244,26 @@ async def call_agent_async(runner, user_id, session_id, query):
     return final_response_text
 
 
+# Bug Reporting Agent callbacks, resolved on first use; that module imports this one
+_callbacks = None
+
+
+def _get_callbacks():
+    """Return the Bug Reporting Agent callbacks handler, importing it only once."""
+    global _callbacks
+    if _callbacks is None:
+        from bug_reporting_agent.agent import get_bug_reporting_callbacks
+        _callbacks = get_bug_reporting_callbacks()
+    return _callbacks
+
+
 async def call_agent_async_with_callbacks(runner, user_id, session_id, query):
     """
     Enhanced agent call with pre and post callback support.
     This version integrates with the Guard Agent callbacks for duplicate detection and level assignment.
     """
-    from bug_reporting_agent.agent import get_bug_reporting_callbacks
-    
     content = types.Content(role="user", parts=[types.Part(text=query)])
-    print(
-        f"\n{Colors.BG_GREEN}{Colors.BLACK}{Colors.BOLD}--- Processing with Callbacks: {query} ---{Colors.RESET}"
-    )
+    print(_PROCESSING_WITH_CALLBACKS_FMT.format(query=query))
     final_response_text = None
 
     # State display removed as requested
@@ -221,12 +274,13 @@ async def call_agent_async_with_callbacks(runner, user_id, session_id, query):
             app_name=runner.app_name, user_id=user_id, session_id=session_id
         )
         user_email = session.state.get("user_email", "") if session else ""
-    except:
+    except Exception:
         user_email = ""
 
     # PRE-AGENT CALLBACK: Check for duplicates
-    callbacks = get_bug_reporting_callbacks()
-    pre_callback_result = callbacks.pre_agent_callback(query, user_id, user_email)
+    # The callbacks do blocking SQLite and SMTP work, so keep them off the event loop
+    callbacks = _get_callbacks()
+    pre_callback_result = await asyncio.to_thread(callbacks.pre_agent_callback, query, user_id, user_email)
     
     if not pre_callback_result.get("proceed", True):
         # Duplicate detected - don't proceed with bug report creation
@@ -240,9 +294,9 @@ async def call_agent_async_with_callbacks(runner, user_id, session_id, query):
         
         # Display message to user instead of creating bug report
         duplicate_message = pre_callback_result.get("message", "Duplicate issue detected")
-        print(f"\n{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╔══ BUG REPORTING AGENT ═══════════════════════════════════{Colors.RESET}")
-        print(f"{Colors.CYAN}{Colors.BOLD}{duplicate_message}{Colors.RESET}")
-        print(f"{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╚════════════════════════════════════════════════════════════{Colors.RESET}\n")
+        print(f"\n{_FINAL_BANNER_TOP}")
+        print(_RESPONSE_TEXT_FMT.format(duplicate_message))
+        print(f"{_FINAL_BANNER_BOTTOM}\n")
         
         return duplicate_message
 
@@ -257,15 +311,14 @@ async def call_agent_async_with_callbacks(runner, user_id, session_id, query):
                 final_response_text = response
                 
                 # POST-AGENT CALLBACK: Check if a bug report was created and trigger level assignment
-                if "bug report" in response.lower() and "created successfully" in response.lower():
+                if _BUG_REPORT_RE.search(response) and _CREATED_RE.search(response):
                     # Extract incident ID from response if possible
-                    import re
-                    bug_id_match = re.search(r'BUG-\d+', response)
+                    bug_id_match = _BUG_ID_RE.search(response)
                     if bug_id_match:
                         bug_id = bug_id_match.group()
                         print(f"\n{Colors.BG_MAGENTA}{Colors.WHITE}{Colors.BOLD}🔄 Triggering Post-Callback for {bug_id}{Colors.RESET}")
                         
-                        post_callback_result = callbacks.post_agent_callback(bug_id, query)
+                        post_callback_result = await asyncio.to_thread(callbacks.post_agent_callback, bug_id, query)
                         
                         if post_callback_result.get("status") == "success":
                             print(f"{Colors.GREEN}✅ Guard Agent triggered for level assignment{Colors.RESET}")